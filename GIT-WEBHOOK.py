@@ -1,21 +1,72 @@
+# GitHub -> Telegram webhook relay.
+#
+# Run under gunicorn with a single threaded worker:
+#     gunicorn -w 1 -k gthread --threads 8 -b 0.0.0.0:$PORT GIT-WEBHOOK:app
+# or `python GIT-WEBHOOK.py`, which launches the same command.
+# Either way, TELEGRAM_TOKEN and CHAT_ID must be set or the app refuses to load.
+# Keep it to one worker process: the send queue, rate limiter, delivery cache and
+# push coalescing all live in process memory, so extra workers would each get
+# their own copy. Request threads only enqueue messages and the background
+# sender does the Telegram calls, so threads give enough concurrency and the
+# app can stay synchronous Flask + requests.
+
 import os
+import atexit
 import hmac
 import hashlib
+import io
 import logging
+import queue
+import threading
+import time
+from collections import defaultdict
 from datetime import datetime
-from flask import Flask, request, jsonify
+from itertools import islice
+from logging.handlers import QueueHandler, QueueListener
+from cachetools import TTLCache
+import orjson
+from flask import Flask, Response, request
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException, Timeout
+from urllib3.util.retry import Retry
+
+# Configure logging: request threads only enqueue records, a listener thread writes them out
+# The log file sits next to this script, so the launcher and gunicorn (run with --chdir) share it
+LOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'webhook.log')
+log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+log_handlers = [
+    logging.FileHandler(LOG_FILE),
+    logging.StreamHandler()
+]
+for log_handler in log_handlers:
+    log_handler.setFormatter(log_formatter)
+
+log_queue = queue.Queue(-1)
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.INFO)
+root_logger.addHandler(QueueHandler(log_queue))
+
+log_listener = QueueListener(log_queue, *log_handlers)
+_log_listener_running = False
+
+def start_logging():
+    """Start the log listener thread; safe to call more than once"""
+    global _log_listener_running
+    if not _log_listener_running:
+        log_listener.start()
+        _log_listener_running = True
+
+def stop_logging():
+    """Stop the log listener, flushing queued records; safe to call more than once"""
+    global _log_listener_running
+    if _log_listener_running:
+        log_listener.stop()
+        _log_listener_running = False
+
+start_logging()
+atexit.register(stop_logging)  # Flush queued records on shutdown
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('webhook.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
@@ -24,16 +75,95 @@ app = Flask(__name__)
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN", "")
 CHAT_ID = os.getenv("CHAT_ID", "")
 GITHUB_WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET")  # Optional webhook secret
+_SECRET_BYTES = GITHUB_WEBHOOK_SECRET.encode('utf-8') if GITHUB_WEBHOOK_SECRET else None
 MAX_MESSAGE_LENGTH = 4096  # Telegram message limit
+PAYLOAD_CHUNK_SIZE = 65536  # Bytes read from the request stream at a time
+MAX_RATE_LIMIT_RETRIES = 3  # Resend attempts after a Telegram 429
+DELIVERY_CACHE_SIZE = 10000  # Recent X-GitHub-Delivery IDs remembered for deduplication
+DELIVERY_CACHE_TTL = 600  # Seconds a delivery ID is remembered
+SEND_QUEUE_SIZE = 10000  # Pending Telegram messages before new ones are dropped
+COALESCE_WINDOW = 2.0  # Seconds to merge pushes to the same repo and branch
+SHUTDOWN_DRAIN_TIMEOUT = 10.0  # Seconds to keep sending queued messages on exit
+
+# Send priorities (lower is sent first)
+PRIORITY_WAKE = -1   # internal worker wake-ups
+PRIORITY_HIGH = 0    # push, release
+PRIORITY_NORMAL = 1  # issues, pull requests
+PRIORITY_LOW = 2     # stars
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` acquisitions every `per` seconds"""
+    def __init__(self, rate, per):
+        self.capacity = rate
+        self.fill_rate = rate / per
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available, honouring any active pause"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.fill_rate
+            time.sleep(wait)
+    
+    def pause(self, seconds):
+        """Stop handing out tokens for the next `seconds` seconds"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+class TelegramRetry(Retry):
+    """urllib3 Retry that leaves 429 responses to the token-bucket rate limiter"""
+    # urllib3 retries any status in this set that carries Retry-After, even outside status_forcelist
+    RETRY_AFTER_STATUS_CODES = frozenset([413, 503])
 
 class TelegramBot:
     def __init__(self, token, chat_id):
         self.token = token
         self.chat_id = chat_id
         self.base_url = f"https://api.telegram.org/bot{token}"
+        
+        # Reuse one pooled keep-alive connection instead of a new TLS handshake per message
+        self.session = requests.Session()
+        # Transient failures are retried with jittered backoff at the transport layer.
+        # 429 is never retried here; it comes straight back to the token-bucket pause
+        # in _send_single_message, which keeps every resend behind the rate limiter.
+        # Read errors are not retried either: Telegram may already have delivered the
+        # message, so resending could post it twice
+        retry = TelegramRetry(
+            total=5,
+            read=0,
+            backoff_factor=0.5,
+            backoff_jitter=0.5,  # urllib3 >= 2.0
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=frozenset(["POST"]),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.headers["Content-Type"] = "application/json"  # Bodies are pre-serialized with orjson
+        
+        # Built once, reused by every send
+        self._send_url = f"{self.base_url}/sendMessage"
+        self._base_payload = {"chat_id": chat_id}
+        
+        # Telegram limits: ~30 messages/second overall, 20 messages/minute per chat
+        self._global = TokenBucket(rate=30, per=1.0)
+        self._per_chat = defaultdict(lambda: TokenBucket(rate=20, per=60.0))
     
     def send_message(self, text, parse_mode="Markdown", disable_web_page_preview=True):
-        """Send message to Telegram with error handling and message length management"""
+        """Send message to Telegram, logging requests that still fail after retries"""
         try:
             # Split long messages
             if len(text) > MAX_MESSAGE_LENGTH:
@@ -42,23 +172,43 @@ class TelegramBot:
                     self._send_single_message(msg, parse_mode, disable_web_page_preview)
             else:
                 self._send_single_message(text, parse_mode, disable_web_page_preview)
-        except Exception as e:
+        except RequestException as e:
             logger.error(f"Failed to send Telegram message: {e}")
     
     def _send_single_message(self, text, parse_mode, disable_web_page_preview):
         """Send a single message to Telegram"""
-        url = f"{self.base_url}/sendMessage"
-        payload = {
-            "chat_id": self.chat_id,
-            "text": text,
-            "parse_mode": parse_mode,
-            "disable_web_page_preview": disable_web_page_preview
-        }
+        payload = self._base_payload.copy()
+        payload["text"] = text
+        payload["parse_mode"] = parse_mode
+        payload["disable_web_page_preview"] = disable_web_page_preview
+        body = orjson.dumps(payload)
+        
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            # Blocks the send worker until both buckets allow another message
+            self._global.acquire()
+            self._per_chat[self.chat_id].acquire()
+            
+            response = self.session.post(self._send_url, data=body, timeout=(3.05, 10))
+            if response.status_code != 429:
+                break
+            
+            retry_after = self._get_retry_after(response)
+            self._global.pause(retry_after)  # Later messages still wait out the limit
+            if attempt < MAX_RATE_LIMIT_RETRIES:
+                logger.warning(f"Telegram rate limit hit, retrying after {retry_after}s")
+            else:
+                logger.error(f"Telegram rate limit hit {attempt + 1} times, dropping message")
         
-        response = requests.post(url, json=payload, timeout=10)
         response.raise_for_status()
         logger.info(f"Message sent successfully to chat {self.chat_id}")
     
+    def _get_retry_after(self, response):
+        """Extract the retry_after delay from a Telegram 429 response"""
+        try:
+            return float(response.json()["parameters"]["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            return 1.0
+    
     def _split_message(self, text):
         """Split long messages into chunks"""
         messages = []
@@ -72,35 +222,172 @@ class TelegramBot:
             messages.append(text)
         return messages
 
+# Validate configuration at import so running gunicorn directly is covered too
+if not TELEGRAM_TOKEN or not CHAT_ID:
+    logger.error("TELEGRAM_TOKEN and CHAT_ID must be configured")
+    if __name__ == "__main__":
+        exit(1)
+    # An exception (not SystemExit) makes gunicorn halt instead of respawning the worker
+    raise RuntimeError("TELEGRAM_TOKEN and CHAT_ID must be configured")
+
 # Initialize Telegram bot
 telegram_bot = TelegramBot(TELEGRAM_TOKEN, CHAT_ID)
 
-def verify_github_signature(payload_body, signature_header):
+# Messages are queued as (priority, timestamp, text) and sent by a background worker
+# so the webhook can acknowledge GitHub without waiting on Telegram
+_send_queue = queue.PriorityQueue(maxsize=SEND_QUEUE_SIZE)
+
+# Pushes waiting out their coalescing window: (repo, ref) -> [deadline, pushes]
+_pending_pushes = {}
+_pending_lock = threading.Lock()
+
+def _put_message(priority, message):
+    """Put a message on the send queue, dropping it if the queue is full"""
+    try:
+        _send_queue.put_nowait((priority, time.monotonic(), message))
+    except queue.Full:
+        logger.error("Telegram send queue is full, dropping message")
+
+def enqueue_message(message, priority=PRIORITY_NORMAL):
+    """Queue a message for the background Telegram sender"""
+    _put_message(priority, message)
+
+def enqueue_push(repo, ref, pusher, commits, compare_url):
+    """Queue a push, merging it with other pushes to the same branch within COALESCE_WINDOW seconds"""
+    push = {"pusher": pusher, "commits": commits, "compare_url": compare_url}
+    with _pending_lock:
+        pending = _pending_pushes.get((repo, ref))
+        if pending:
+            pending[1].append(push)
+            return
+        _pending_pushes[(repo, ref)] = [time.monotonic() + COALESCE_WINDOW, [push]]
+    
+    # An empty message wakes the worker so it picks up the new deadline. If the queue
+    # is full the worker is busy anyway and rechecks deadlines after every send
+    try:
+        _send_queue.put_nowait((PRIORITY_WAKE, time.monotonic(), ""))
+    except queue.Full:
+        pass
+
+def _flush_pending_pushes():
+    """Queue coalesced pushes whose window has elapsed and return seconds until the next one"""
+    now = time.monotonic()
+    next_deadline = None
+    with _pending_lock:
+        for (repo, ref), (deadline, pushes) in list(_pending_pushes.items()):
+            if deadline <= now:
+                del _pending_pushes[(repo, ref)]
+                _put_message(PRIORITY_HIGH, format_push_message(repo, ref, pushes))
+            elif next_deadline is None or deadline < next_deadline:
+                next_deadline = deadline
+    return None if next_deadline is None else next_deadline - now
+
+def _send_worker():
+    """Drain the send queue, one Telegram message at a time"""
+    while True:
+        timeout = _flush_pending_pushes()
+        try:
+            _, _, message = _send_queue.get(timeout=timeout)
+        except queue.Empty:
+            continue
+        try:
+            if message:
+                telegram_bot.send_message(message)
+        except Exception:
+            logger.exception("Unexpected error in Telegram send worker")
+        finally:
+            _send_queue.task_done()
+
+def _drain_send_queue():
+    """Send queued and still-coalescing messages before exit, for up to SHUTDOWN_DRAIN_TIMEOUT seconds"""
+    with _pending_lock:
+        for (repo, ref), (_, pushes) in _pending_pushes.items():
+            _put_message(PRIORITY_HIGH, format_push_message(repo, ref, pushes))
+        _pending_pushes.clear()
+    
+    # GitHub already has a 200 for these events and won't redeliver them
+    deadline = time.monotonic() + SHUTDOWN_DRAIN_TIMEOUT
+    while _send_queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.1)
+    if _send_queue.unfinished_tasks:
+        logger.warning(f"Shutting down with {_send_queue.unfinished_tasks} Telegram messages unsent")
+
+threading.Thread(target=_send_worker, name="telegram-sender", daemon=True).start()
+atexit.register(_drain_send_queue)  # Runs before stop_logging, so its records are still written
+
+# Recently seen delivery IDs, so GitHub redeliveries don't post to Telegram twice
+_seen_deliveries = TTLCache(maxsize=DELIVERY_CACHE_SIZE, ttl=DELIVERY_CACHE_TTL)
+_seen_deliveries_lock = threading.Lock()
+
+def is_duplicate_delivery(delivery):
+    """Record a delivery ID and report whether it was already seen"""
+    if not delivery:
+        return False
+    with _seen_deliveries_lock:
+        if delivery in _seen_deliveries:
+            return True
+        _seen_deliveries[delivery] = True
+    return False
+
+def forget_delivery(delivery):
+    """Drop a recorded delivery ID so a GitHub redelivery is handled again"""
+    if not delivery:
+        return
+    with _seen_deliveries_lock:
+        _seen_deliveries.pop(delivery, None)
+
+def read_payload(stream):
+    """Read the request body in chunks, hashing each one as it arrives if a secret is configured"""
+    hash_object = hmac.new(_SECRET_BYTES, digestmod=hashlib.sha256) if _SECRET_BYTES else None
+    buffer = io.BytesIO()
+    for chunk in iter(lambda: stream.read(PAYLOAD_CHUNK_SIZE), b''):
+        if hash_object:
+            hash_object.update(chunk)
+        buffer.write(chunk)
+    return buffer.getvalue(), hash_object
+
+def verify_github_signature(hash_object, signature_header):
     """Verify GitHub webhook signature for security"""
-    if not GITHUB_WEBHOOK_SECRET or not signature_header:
+    if not hash_object or not signature_header:
         return True  # Skip verification if no secret is configured
     
     try:
-        hash_object = hmac.new(
-            GITHUB_WEBHOOK_SECRET.encode('utf-8'),
-            msg=payload_body,
-            digestmod=hashlib.sha256
-        )
-        expected_signature = "sha256=" + hash_object.hexdigest()
-        return hmac.compare_digest(expected_signature, signature_header)
+        if not signature_header.startswith("sha256="):
+            return False
+        signature = bytes.fromhex(signature_header[7:])
+        return hmac.compare_digest(hash_object.digest(), signature)
     except Exception as e:
         logger.error(f"Signature verification error: {e}")
         return False
 
+ISSUE_EMOJI = {
+    "opened": "🐛",
+    "closed": "✅",
+    "reopened": "🔄",
+    "assigned": "👤",
+    "unassigned": "👤",
+    "labeled": "🏷️",
+    "unlabeled": "🏷️"
+}
+
+PR_EMOJI = {
+    "opened": "🔀",
+    "closed": "❌",  # Merged PRs are closed too; handled separately
+    "reopened": "🔄",
+    "merged": "🎉",
+    "ready_for_review": "👀",
+    "review_requested": "👀"
+}
+
 def format_commit_info(commits):
     """Format commit information for display"""
     if not commits:
         return ""
     
     commit_info = []
-    for commit in commits[:5]:  # Limit to 5 commits
+    for commit in islice(commits, 5):  # Limit to 5 commits
         author = commit.get('author', {}).get('name', 'Unknown')
-        message = commit.get('message', '').split('\n')[0][:100]  # First line, max 100 chars
+        message = commit.get('message', '').partition('\n')[0][:100]  # First line, max 100 chars
         commit_id = commit.get('id', '')[:7]  # Short commit hash
         commit_info.append(f"• `{commit_id}` {message} - {author}")
     
@@ -109,6 +396,33 @@ def format_commit_info(commits):
     
     return '\n'.join(commit_info)
 
+def format_push_message(repo, ref, pushes):
+    """Format one or more coalesced pushes to the same branch as a single message"""
+    commits = [commit for push in pushes for commit in push["commits"]]
+    pushers = list(dict.fromkeys(push["pusher"] for push in pushes))
+    compare_url = pushes[-1]["compare_url"]  # The latest push shows the branch as it is now
+    
+    commit_count = len(commits)
+    commit_word = "commit" if commit_count == 1 else "commits"
+    push_title = "Push" if len(pushes) == 1 else f"{len(pushes)} pushes"
+    pusher_names = ", ".join(f"`{pusher}`" for pusher in pushers)
+    
+    parts = [
+        f"🚀 *{push_title} to {repo}*",
+        f"📝 {commit_count} {commit_word} by {pusher_names} to `{ref}`"
+    ]
+    
+    if commits:
+        parts.extend([
+            "",
+            "*Commits:*",
+            format_commit_info(commits),
+            "",
+            f"[View Changes]({compare_url})"
+        ])
+    
+    return "\n".join(parts)
+
 def handle_push_event(payload):
     """Handle GitHub push events"""
     repo = payload.get("repository", {}).get("full_name", "Unknown")
@@ -117,18 +431,7 @@ def handle_push_event(payload):
     commits = payload.get("commits", [])
     compare_url = payload.get("compare", "")
     
-    commit_count = len(commits)
-    commit_word = "commit" if commit_count == 1 else "commits"
-    
-    message = f"🚀 *Push to {repo}*\n"
-    message += f"📝 {commit_count} {commit_word} by `{pusher}` to `{ref}`\n\n"
-    
-    if commits:
-        message += "*Commits:*\n"
-        message += format_commit_info(commits)
-        message += f"\n\n[View Changes]({compare_url})"
-    
-    telegram_bot.send_message(message)
+    enqueue_push(repo, ref, pusher, commits, compare_url)
 
 def handle_issues_event(payload):
     """Handle GitHub issues events"""
@@ -140,23 +443,13 @@ def handle_issues_event(payload):
     repo = payload.get("repository", {}).get("full_name", "Unknown")
     user = payload.get("sender", {}).get("login", "Unknown")
     
-    emoji_map = {
-        "opened": "🐛",
-        "closed": "✅",
-        "reopened": "🔄",
-        "assigned": "👤",
-        "unassigned": "👤",
-        "labeled": "🏷️",
-        "unlabeled": "🏷️"
-    }
-    
-    emoji = emoji_map.get(action, "📋")
+    emoji = ISSUE_EMOJI.get(action, "📋")
     
     message = f"{emoji} *Issue {action}* in {repo}\n"
     message += f"#{issue_number}: [{issue_title}]({issue_url})\n"
     message += f"by `{user}`"
     
-    telegram_bot.send_message(message)
+    enqueue_message(message, PRIORITY_NORMAL)
 
 def handle_pull_request_event(payload):
     """Handle GitHub pull request events"""
@@ -168,16 +461,10 @@ def handle_pull_request_event(payload):
     repo = payload.get("repository", {}).get("full_name", "Unknown")
     user = payload.get("sender", {}).get("login", "Unknown")
     
-    emoji_map = {
-        "opened": "🔀",
-        "closed": "✅" if pr.get("merged") else "❌",
-        "reopened": "🔄",
-        "merged": "🎉",
-        "ready_for_review": "👀",
-        "review_requested": "👀"
-    }
-    
-    emoji = emoji_map.get(action, "🔀")
+    if action == "closed" and pr.get("merged"):
+        emoji = "✅"
+    else:
+        emoji = PR_EMOJI.get(action, "🔀")
     
     message = f"{emoji} *PR {action}* in {repo}\n"
     message += f"#{pr_number}: [{pr_title}]({pr_url})\n"
@@ -188,7 +475,7 @@ def handle_pull_request_event(payload):
         message = message.replace("closed", "merged")
         message = message.replace("❌", "🎉")
     
-    telegram_bot.send_message(message)
+    enqueue_message(message, PRIORITY_NORMAL)
 
 def handle_release_event(payload):
     """Handle GitHub release events"""
@@ -203,7 +490,7 @@ def handle_release_event(payload):
         message = f"🎉 *New Release* in {repo}\n"
         message += f"📦 [{name}]({html_url})\n"
         message += f"Tag: `{tag_name}`"
-        telegram_bot.send_message(message)
+        enqueue_message(message, PRIORITY_HIGH)
 
 def handle_star_event(payload):
     """Handle GitHub star events"""
@@ -216,16 +503,30 @@ def handle_star_event(payload):
         message = f"⭐ *New Star* for {repo}\n"
         message += f"Starred by `{user}`\n"
         message += f"Total stars: {stars}"
-        telegram_bot.send_message(message)
+        enqueue_message(message, PRIORITY_LOW)
+
+EVENT_HANDLERS = {
+    "push": handle_push_event,
+    "issues": handle_issues_event,
+    "pull_request": handle_pull_request_event,
+    "release": handle_release_event,
+    "star": handle_star_event
+}
+
+def json_response(data, status=200):
+    """Serialize a JSON response with orjson"""
+    return Response(orjson.dumps(data), status=status, mimetype="application/json")
 
 @app.route("/health", methods=["GET"])
 def health_check():
     """Health check endpoint"""
-    return jsonify({"status": "healthy", "timestamp": datetime.now().isoformat()})
+    return json_response({"status": "healthy", "timestamp": datetime.now().isoformat()})
 
 @app.route("/github-webhook", methods=["POST"])
 def github_webhook():
     """Main webhook endpoint"""
+    delivery = None
+    recorded = False  # Whether this request has claimed its delivery ID
     try:
         # Get headers
         event = request.headers.get("X-GitHub-Event")
@@ -233,68 +534,76 @@ def github_webhook():
         delivery = request.headers.get("X-GitHub-Delivery")
         
         # Get payload
-        payload_body = request.get_data()
+        payload_body, body_hash = read_payload(request.stream)
         
         # Verify signature if secret is configured
-        if not verify_github_signature(payload_body, signature):
+        if not verify_github_signature(body_hash, signature):
             logger.warning(f"Invalid signature for delivery {delivery}")
-            return jsonify({"error": "Invalid signature"}), 401
+            return json_response({"error": "Invalid signature"}, 401)
+        
+        # Skip redelivered webhooks we have already handled
+        if is_duplicate_delivery(delivery):
+            logger.info(f"Ignoring duplicate delivery {delivery}")
+            return json_response({"status": "duplicate"}, 200)
+        recorded = True
         
         # Parse JSON payload
         try:
-            payload = request.get_json(force=True)
-        except Exception as e:
+            payload = orjson.loads(payload_body)
+        except orjson.JSONDecodeError as e:
             logger.error(f"Invalid JSON payload: {e}")
-            return jsonify({"error": "Invalid JSON"}), 400
+            forget_delivery(delivery)
+            return json_response({"error": "Invalid JSON"}, 400)
         
         logger.info(f"Received {event} event (delivery: {delivery})")
         
         # Handle different event types
-        if event == "push":
-            handle_push_event(payload)
-        elif event == "issues":
-            handle_issues_event(payload)
-        elif event == "pull_request":
-            handle_pull_request_event(payload)
-        elif event == "release":
-            handle_release_event(payload)
-        elif event == "star":
-            handle_star_event(payload)
+        handler = EVENT_HANDLERS.get(event)
+        if handler:
+            handler(payload)
         else:
             logger.info(f"Unhandled event type: {event}")
         
-        return jsonify({"status": "success"}), 200
+        return json_response({"status": "success"}, 200)
         
-    except RequestException as e:
-        logger.error(f"Network error: {e}")
-        return jsonify({"error": "Network error"}), 500
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
-        return jsonify({"error": "Internal server error"}), 500
+        if recorded:
+            forget_delivery(delivery)  # Let GitHub's redelivery of the failed event through
+        return json_response({"error": "Internal server error"}, 500)
 
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({"error": "Not found"}), 404
+    return json_response({"error": "Not found"}, 404)
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({"error": "Internal server error"}), 500
+    return json_response({"error": "Internal server error"}, 500)
 
 if __name__ == "__main__":
-    # Validate configuration
-    if not TELEGRAM_TOKEN or not CHAT_ID:
-        logger.error("TELEGRAM_TOKEN and CHAT_ID must be configured")
-        exit(1)
-    
     logger.info("Starting GitHub webhook server...")
     
-    # Run with better configuration for production
-    port = int(os.getenv("PORT", 5000))
-    debug = os.getenv("FLASK_ENV") == "development"
+    # Serve with one threaded gunicorn worker instead of the Flask dev server
+    port = os.getenv("PORT", "5000")
+    threads = os.getenv("GUNICORN_THREADS", "8")
     
-    app.run(
-        host="0.0.0.0",
-        port=port,
-        debug=debug,
-        threaded=True
-    )
+    # execvp replaces the process without running atexit, so flush queued log records now
+    stop_logging()
+    try:
+        os.execvp("gunicorn", [
+            "gunicorn",
+            "--workers", "1",  # Rate limiting, dedup and coalescing state is per process
+            "--worker-class", "gthread",
+            "--threads", threads,
+            "--bind", f"0.0.0.0:{port}",
+            "--chdir", os.path.dirname(os.path.abspath(__file__)),
+            "GIT-WEBHOOK:app"
+        ])
+    except OSError as e:
+        # The exec failed and this process carries on, so bring logging back
+        start_logging()
+        if isinstance(e, FileNotFoundError):
+            logger.error("gunicorn is not installed; install it with `pip install gunicorn`")
+        else:
+            logger.error(f"Could not start gunicorn: {e}")
+        exit(1)
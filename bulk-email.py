@@ -1,10 +1,16 @@
 import csv
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import yagmail
 
 # === Gmail SMTP credentials ===
 GMAIL_USER = "YOUR-EMAIL"        # Replace with your Gmail
 GMAIL_APP_PASS = "GOOGLE-APP-PASSWORD "      # Google App Password
 
+# === Concurrency ===
+MAX_WORKERS = 8                  # Parallel SMTP connections (Gmail allows ~100)
+MAX_PENDING = MAX_WORKERS * 2    # Rows read ahead of the senders
+
 # === Email Subject ===
 
 subject = "TEMPORARY PAYMENT PROCESSING DELAY - SPERNET MALL"
@@ -13,33 +19,45 @@ subject = "TEMPORARY PAYMENT PROCESSING DELAY - SPERNET MALL"
 with open("email_template.html", "r", encoding="utf-8") as f:
     email_template = f.read()
 
-# === Load recipients from CSV ===
-recipients = []
-with open("recipients.csv", newline="", encoding="utf-8") as csvfile:
-    reader = csv.DictReader(csvfile)
-    for row in reader:
-        recipients.append(row)
+# Split once around the placeholder so personalizing is a plain join
+template_parts = email_template.split("{full_name}")
 
-print(f"✅ Loaded {len(recipients)} recipients from CSV")
+# === One Yagmail connection per worker thread (SMTP objects aren't thread-safe) ===
+local = threading.local()
 
-# === Initialize Yagmail ===
-yag = yagmail.SMTP(GMAIL_USER, GMAIL_APP_PASS)
+def get_yag():
+    if not hasattr(local, "yag"):
+        local.yag = yagmail.SMTP(GMAIL_USER, GMAIL_APP_PASS)
+    return local.yag
 
-# === Loop through recipients and send email ===
-for person in recipients:
-    first = person["first_name"].strip()
-    last = person["last_name"].strip()
-    email = person["email"].strip()
+def send_one(person):
+    # Bad CSV rows fail here too, so they are reported like any other failed send
+    try:
+        first = person["first_name"].strip()
+        last = person["last_name"].strip()
+        email = person["email"].strip()
 
-    full_name = f"{first} {last}"
+        full_name = f"{first} {last}"
 
-    # Personalize email HTML
-    html_content = email_template.format(full_name=full_name)
+        # Personalize email HTML
+        html_content = full_name.join(template_parts)
 
-    try:
-        yag.send(to=email, subject=subject, contents=html_content)
+        get_yag().send(to=email, subject=subject, contents=html_content)
         print(f"✅ Sent email to {full_name} <{email}>")
     except Exception as e:
-        print(f"❌ Failed to send email to {email}: {e}")
+        print(f"❌ Failed to send email to {person.get('email') or person}: {e}")
+
+# === Stream recipients from CSV and send emails concurrently ===
+pending = threading.BoundedSemaphore(MAX_PENDING)
+count = 0
+
+with open("recipients.csv", newline="", encoding="utf-8") as csvfile, \
+        ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+    reader = csv.DictReader(csvfile)
+    for row in reader:
+        pending.acquire()  # Don't read further ahead than the senders can keep up with
+        future = executor.submit(send_one, row)
+        future.add_done_callback(lambda _: pending.release())
+        count += 1
 
-print("🎉 All emails processed!")
+print(f"🎉 All {count} emails processed!")